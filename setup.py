@@ -59,6 +59,9 @@ setup(
     # To provide executable scripts, use entry points in preference to the
     # "scripts" keyword. Entry points provide cross-platform support and allow
     # pip to create the appropriate form of executable for the target platform.
-    entry_points={"console_scripts": ["ukrainian-word-stress=ukrainian_word_stress.cli:main"]},
+    entry_points={"console_scripts": [
+        "ukrainian-word-stress=ukrainian_word_stress.cli:main",
+        "ukrainian-word-stress-batch=ukrainian_word_stress.batch:main",
+    ]},
 
 )
@@ -1,6 +1,6 @@
 import ua_gec
 import time
-from ukrainian_word_stress import Stressifier
+from ukrainian_word_stress import Stressifier, find_accent_positions
 
 "42306 parsed in 38.603643499998725 seconds (1095.9069187342743 tokens/sec)"
 
@@ -24,6 +24,39 @@ def benchmark():
     perf = tokens / elapsed
     print(f"{tokens} tokens stressified in {elapsed} seconds ({perf} tokens/sec)")
 
+    benchmark_token_overhead(stressify, text, parsed, tokens)
+
+
+def benchmark_token_overhead(stressify, text, parsed, tokens):
+    """Measure Python time spent per token after Stanza is done.
+
+    Both loops look words up in the same dictionary and build the output,
+    so the difference is the per-token overhead of the loop itself.
+    """
+
+    from ukrainian_word_stress.mutable_text import MutableText
+
+    # Before: the original loop body (`token.to_dict()`, every token
+    # goes to the dictionary and to the output)
+    dictionary = stressify.dict
+    t0 = time.perf_counter()
+    result = MutableText(text)
+    for token in parsed.iter_tokens():
+        accents = find_accent_positions(dictionary, token.to_dict()[0], stressify.on_ambiguity)
+        accented_token = stressify._apply_accent_positions(token.text, accents)
+        if accented_token != token:
+            result.replace(token.start_char, token.end_char, accented_token)
+    before = result.get_edited_text()
+    elapsed = time.perf_counter() - t0
+    print(f"to_dict() loop: {elapsed / tokens * 1e6:.2f} µs/token")
+
+    # After: reading word fields directly
+    t0 = time.perf_counter()
+    after = stressify._stressify_parsed(dictionary, text, parsed)
+    elapsed = time.perf_counter() - t0
+    print(f"Stressifier loop: {elapsed / tokens * 1e6:.2f} µs/token")
+
+    assert before == after
 
 
 
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import time
+
+from ukrainian_word_stress.compile_dict import compile
+from ukrainian_word_stress.dictionary import SERVICE_KEYS, load_dictionary
+
+
+def benchmark(csv_path):
+    """Compare dictionary format versions: file size, load time, lookup speed."""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for version in (1, 2):
+            path = os.path.join(tmp, f"stress.v{version}.trie")
+            compile(csv_path, version=version).save(path)
+            size = os.path.getsize(path)
+
+            t0 = time.perf_counter()
+            dictionary = load_dictionary(path)
+            load_time = time.perf_counter() - t0
+
+            words = [word for word in dictionary.trie.keys() if word not in SERVICE_KEYS]
+            # Best of several passes, a single one is too noisy
+            elapsed = float('inf')
+            for _ in range(5):
+                t0 = time.perf_counter()
+                for word in words:
+                    dictionary.lookup(word)
+                elapsed = min(elapsed, time.perf_counter() - t0)
+
+            print(f"Version {version}:")
+            print(f"  File size:    {size} bytes")
+            print(f"  Load time:    {load_time * 1000:.1f} ms")
+            print(f"  Lookup speed: {len(words) / elapsed:.0f} words/sec")
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1])
@@ -0,0 +1,47 @@
+import time
+
+import ua_gec
+from ukrainian_word_stress import Stressifier, find_accent_positions, OnAmbiguity
+
+
+def benchmark():
+    """Compare float and int8 quantized POS tagger on CPU.
+
+    Reports speed of both models and how often they agree on stress
+    of heteronyms (words whose stress depends on the parse).
+    """
+
+    corpus = ua_gec.Corpus('test')
+    text = '\n'.join([doc.target for doc in corpus])
+
+    parses = {}
+    for quantize in (False, True):
+        stressify = Stressifier(use_gpu=False, quantize=quantize)
+        t0 = time.perf_counter()
+        parses[quantize] = stressify.nlp(text)
+        elapsed = time.perf_counter() - t0
+        tokens = len(list(parses[quantize].iter_tokens()))
+        name = "int8" if quantize else "float"
+        print(f"{name}: {tokens} tokens parsed in {elapsed:.2f} seconds "
+              f"({tokens / elapsed:.0f} tokens/sec)")
+
+    dictionary = stressify.dict
+    heteronyms = agree = 0
+    for token_float, token_int8 in zip(parses[False].iter_tokens(),
+                                       parses[True].iter_tokens()):
+        options = dictionary.lookup(token_float.text)
+        if options is None or len({repr(accents) for _, accents in options}) < 2:
+            continue
+        heteronyms += 1
+        accents_float = find_accent_positions(
+            dictionary, token_float.to_dict()[0], OnAmbiguity.Skip)
+        accents_int8 = find_accent_positions(
+            dictionary, token_int8.to_dict()[0], OnAmbiguity.Skip)
+        agree += accents_float == accents_int8
+
+    print(f"Heteronyms: {heteronyms}, same stress: {agree} "
+          f"({agree / max(heteronyms, 1):.2%})")
+
+
+if __name__ == "__main__":
+    benchmark()
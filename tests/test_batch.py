@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from ukrainian_word_stress.batch import select_shard, run
+
+
+def test_select_shard():
+    paths = [f"{i}.txt" for i in range(10)]
+    shards = [select_shard(paths, i, 3) for i in range(3)]
+    selected = sorted(path for shard in shards for _, path in shard)
+    assert selected == sorted(paths)
+    assert select_shard(paths, 1, 3) == [(1, "1.txt"), (4, "4.txt"), (7, "7.txt")]
+
+
+def _make_inputs(tmp_path, count):
+    inputs = []
+    for i in range(count):
+        path = tmp_path / f"in{i}.txt"
+        path.write_text("мама\nтато\n", encoding="utf-8")
+        inputs.append(str(path))
+    return inputs
+
+
+def _make_stressify(calls):
+    def stressify(text, stats):
+        calls.append(text)
+        stats['stressed'] += 2
+        return text.upper()
+    return stressify
+
+
+def test_run_resumes(tmp_path):
+    inputs = _make_inputs(tmp_path, 2)
+    output_dir = tmp_path / "out"
+    calls = []
+    stressify = _make_stressify(calls)
+
+    items = select_shard(inputs, 0, 1)
+    run(items, str(output_dir), 0, 1, stressify)
+    assert len(calls) == 2
+    assert (output_dir / "000000-in0.txt").read_text(encoding="utf-8") == "МАМА\nТАТО\n"
+
+    # Completed files are skipped on restart
+    run(items, str(output_dir), 0, 1, stressify)
+    assert len(calls) == 2
+
+    stats = json.loads((output_dir / "stats.0-of-1.json").read_text(encoding="utf-8"))
+    assert stats['files'] == 2
+    assert stats['tokens'] == 4
+    assert stats['outcomes'] == {'stressed': 4}
+
+
+def test_run_recovers_from_truncated_checkpoint(tmp_path):
+    inputs = _make_inputs(tmp_path, 3)
+    output_dir = tmp_path / "out"
+    calls = []
+    stressify = _make_stressify(calls)
+    items = select_shard(inputs, 0, 1)
+
+    # Simulate a crash while writing the checkpoint record of item 1
+    run(items[:1], str(output_dir), 0, 1, stressify)
+    checkpoint_path = output_dir / "checkpoint.0-of-1.jsonl"
+    with open(checkpoint_path, "a", encoding="utf-8") as f:
+        f.write('{"item": 1, "inp')
+
+    run(items, str(output_dir), 0, 1, stressify)
+    assert len(calls) == 3
+
+    # Nothing is processed twice after another restart
+    run(items, str(output_dir), 0, 1, stressify)
+    assert len(calls) == 3
+
+
+def test_run_fails_on_changed_manifest(tmp_path):
+    inputs = _make_inputs(tmp_path, 2)
+    output_dir = tmp_path / "out"
+    stressify = _make_stressify([])
+
+    run(select_shard(inputs, 0, 1), str(output_dir), 0, 1, stressify)
+    with pytest.raises(ValueError):
+        run(select_shard(inputs[::-1], 0, 1), str(output_dir), 0, 1, stressify)
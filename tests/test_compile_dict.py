@@ -1,4 +1,7 @@
-from ukrainian_word_stress.compile_dict import parse_tags, accent_pos
+from ukrainian_word_stress.compile_dict import parse_tags, accent_pos, accent_vowel_pos, compile
+from ukrainian_word_stress.dictionary import StressDictionary, load_dictionary
+import marisa_trie
+import pytest
 
 
 def test_parse_tags():
@@ -8,3 +11,44 @@ def test_parse_tags():
 
 def test_accent_pos():
     assert accent_pos("по́ми́лка") == b'\x02\x04'
+
+
+def test_accent_vowel_pos():
+    assert accent_vowel_pos("по́ми́лка") == b'\x00\x01'
+    assert accent_vowel_pos("яйця́") == b'\x01'
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_compile_versions(tmp_path, version):
+    csv_path = tmp_path / "accents.csv"
+    csv_path.write_text(
+        "form,tag,type\n"
+        "я́йця,множина називний,іменник середнього роду\n"
+        "яйця́,однина родовий,іменник середнього роду\n"
+        "по́ми́лка,однина називний,іменник жіночого роду\n"
+        "кіт,однина називний,іменник чоловічого роду\n",
+        encoding="utf-8",
+    )
+    trie = compile(str(csv_path), version=version)
+    dictionary = StressDictionary(trie)
+
+    assert dictionary.version == version
+    assert dictionary.lookup("Помилка") == [([], [2, 4])]
+    assert dictionary.lookup("кіт") == [([], [])]
+    assert dictionary.lookup("собака") is None
+    assert dictionary.lookup("__version__") is None
+    assert dictionary.lookup("__tagsets__") is None
+    assert sorted(dictionary.lookup("яйця")) == [
+        (['Number=Plur', 'Case=Nom', 'upos=NOUN', 'Gender=Neut'], [1]),
+        (['Number=Sing', 'Case=Gen', 'upos=NOUN', 'Gender=Neut'], [4]),
+    ]
+
+
+def test_load_dictionary_mmap_is_private(tmp_path):
+    path = str(tmp_path / "stress.trie")
+    marisa_trie.BytesTrie([("мама", b'\x01')]).save(path)
+    dictionary = load_dictionary(path, mmap=True)
+
+    # Overwriting the file in place doesn't affect the loaded dictionary
+    marisa_trie.BytesTrie([("тато", b'\x01')]).save(path)
+    assert dictionary.lookup("мама") == [([], [1])]
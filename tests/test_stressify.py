@@ -1,3 +1,5 @@
+import collections
+
 from ukrainian_word_stress import find_accent_positions, Stressifier, OnAmbiguity
 import marisa_trie
 import pytest
@@ -28,6 +30,17 @@ def test_preserve_whitespace_and_punctuation(stressify):
     assert stressify(" Привіт ,  як справи ?") == " Приві´т ,  як спра´ви ?"
 
 
+def test_stats():
+    stressify = Stressifier(on_ambiguity=OnAmbiguity.Skip)
+    stats = collections.Counter()
+    text = "Привіт, замок ґрумпельштільцхен 42 Nokia"
+    assert stressify(text, stats=stats) == "Приві´т, замок ґрумпельштільцхен 42 Nokia"
+    assert stats['stressed'] == 1           # Привіт
+    assert stats['unstressed'] == 1         # замок is ambiguous
+    assert stats['not_in_dictionary'] == 1  # ґрумпельштільцхен
+    assert stats['no_vowel'] == 3           # "," "42" "Nokia"
+
+
 def test_on_ambiguity_skip():
     stressify = Stressifier(on_ambiguity=OnAmbiguity.Skip)
     assert stressify("замок") == "замок"
@@ -57,6 +70,23 @@ def test_regression_splitter():
     assert stressify("веселим") == "весе´лим"
 
 
+def test_reload_dictionary():
+    stressify = Stressifier()
+    old_dict = stressify.dict
+    future = stressify.reload_dictionary("./ukrainian_word_stress/data/stress.trie")
+    future.result()
+    assert stressify.dict is not old_dict
+    assert stressify("Україна") == "Украї´на"
+
+
+def test_reload_dictionary_error(stressify):
+    old_dict = stressify.dict
+    future = stressify.reload_dictionary("./no-such-file.trie")
+    with pytest.raises(Exception):
+        future.result()
+    assert stressify.dict is old_dict
+
+
 def test_find_accent_positions_single(trie):
     parse = {
         "id": 1,
@@ -1,2 +1,3 @@
 from .stressify_ import Stressifier, OnAmbiguity, StressSymbol, find_accent_positions
+from .tuning import autotune
 from .version import __version__
@@ -0,0 +1,203 @@
+import argparse
+import collections
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from ukrainian_word_stress.cli import add_stressifier_arguments, make_stressifier
+
+
+log = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=("Add stress marks to a corpus. Input files are split into "
+                     "shards, so that several machines can process "
+                     "disjoint parts of it. Restarted jobs skip completed files.")
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("manifest", help="Text file with one input path per line")
+    parser.add_argument("output_dir", help="Where to write stressified files, checkpoints and stats")
+    parser.add_argument("--shard-index", type=int, default=0,
+                        help="Index of this job's shard, from 0 to shard count - 1")
+    parser.add_argument("--shard-count", type=int, default=1,
+                        help="Total number of shards (jobs)")
+    parser.add_argument("--chunk-lines", type=int, default=1000,
+                        help="Number of lines to pass to the tagger at once")
+    add_stressifier_arguments(parser)
+    args = parser.parse_args()
+
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be between 0 and --shard-count - 1")
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    items = select_shard(read_manifest(args.manifest), args.shard_index, args.shard_count)
+    run(items, args.output_dir, args.shard_index, args.shard_count,
+        make_stressifier(args), args.chunk_lines)
+
+
+def read_manifest(path: str) -> List[str]:
+    """Return input paths listed in the manifest, skipping empty lines."""
+
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def select_shard(paths: List[str], index: int, count: int) -> List[Tuple[int, str]]:
+    """Return `(item_id, path)` pairs that belong to the shard `index` of `count`.
+
+    Items are assigned round-robin by their position in the manifest, so
+    shards are disjoint and don't depend on where the job runs.
+
+    Example:
+        >>> select_shard(["a", "b", "c", "d", "e"], 1, 2)
+        [(1, 'b'), (3, 'd')]
+    """
+
+    return [(i, path) for i, path in enumerate(paths) if i % count == index]
+
+
+def run(items, output_dir, shard_index, shard_count, stressify, chunk_lines=1000):
+    """Process `items` (see `select_shard`) and write per-shard stats."""
+
+    os.makedirs(output_dir, exist_ok=True)
+    suffix = f"{shard_index}-of-{shard_count}"
+    checkpoint_path = os.path.join(output_dir, f"checkpoint.{suffix}.jsonl")
+    stats_path = os.path.join(output_dir, f"stats.{suffix}.json")
+
+    done = read_checkpoint(checkpoint_path)
+    _terminate_last_line(checkpoint_path)
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        for item_id, input_path in items:
+            record = done.get(item_id)
+            if record is not None and record['input'] != input_path:
+                raise ValueError(
+                    f"Checkpoint {checkpoint_path} has {record['input']} as item "
+                    f"{item_id}, but the manifest has {input_path}. "
+                    f"The manifest must not change between restarts.")
+            if record is not None and os.path.exists(record['output']):
+                log.info("Skipping %s: already done", input_path)
+                continue
+
+            output_path = os.path.join(
+                output_dir, f"{item_id:06d}-{os.path.basename(input_path)}")
+            record = process_file(stressify, item_id, input_path, output_path, chunk_lines)
+            log.info("Done %s: %d tokens in %.1f seconds",
+                     input_path, record['tokens'], record['seconds'])
+
+            checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+            done[item_id] = record
+
+    summary = summarize(done.values())
+    _write_atomic(stats_path, json.dumps(summary, ensure_ascii=False, indent=2) + "\n")
+    log.info("Shard %s: %d files, %d tokens, %.0f tokens/sec",
+             suffix, summary['files'], summary['tokens'], summary['tokens_per_sec'])
+
+
+def process_file(stressify, item_id, input_path, output_path, chunk_lines=1000) -> Dict:
+    """Stressify one input file and return its checkpoint record.
+
+    Output is written to a temporary file and renamed when complete,
+    so a crash never leaves a partial output behind.
+    """
+
+    stats = collections.Counter()
+    t0 = time.perf_counter()
+    tmp_path = output_path + ".tmp"
+    with open(input_path, encoding="utf-8") as fin, \
+            open(tmp_path, "w", encoding="utf-8") as fout:
+        for chunk in _read_chunks(fin, chunk_lines):
+            fout.write(stressify(chunk, stats=stats))
+        fout.flush()
+        os.fsync(fout.fileno())
+    os.replace(tmp_path, output_path)
+    elapsed = time.perf_counter() - t0
+
+    tokens = sum(stats.values())
+    return {
+        'item': item_id,
+        'input': input_path,
+        'output': output_path,
+        'tokens': tokens,
+        'seconds': elapsed,
+        'tokens_per_sec': tokens / elapsed if elapsed else 0.0,
+        'outcomes': dict(stats),
+    }
+
+
+def read_checkpoint(path: str) -> Dict[int, Dict]:
+    """Return records of completed items by their id.
+
+    A truncated last line (from a crash during write) is ignored.
+    """
+
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                log.warning("Ignoring broken checkpoint line: %r", line)
+                continue
+            done[record['item']] = record
+    return done
+
+
+def _terminate_last_line(path):
+    # After a crash in the middle of a write, the last line is incomplete.
+    # Start the next record on a new line, so that it isn't glued to it.
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def summarize(records) -> Dict:
+    """Combine checkpoint records into shard totals."""
+
+    records = sorted(records, key=lambda r: r['item'])
+    outcomes = collections.Counter()
+    for record in records:
+        outcomes.update(record['outcomes'])
+    tokens = sum(r['tokens'] for r in records)
+    seconds = sum(r['seconds'] for r in records)
+    return {
+        'files': len(records),
+        'tokens': tokens,
+        'seconds': seconds,
+        'tokens_per_sec': tokens / seconds if seconds else 0.0,
+        'outcomes': dict(outcomes),
+        'per_file': records,
+    }
+
+
+def _read_chunks(f, chunk_lines) -> Iterator[str]:
+    lines = []
+    for line in f:
+        lines.append(line)
+        if len(lines) >= chunk_lines:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def _write_atomic(path, content):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import argparse
 import fileinput
 import logging
-from ukrainian_word_stress import Stressifier, StressSymbol, __version__
+from ukrainian_word_stress import Stressifier, StressSymbol, autotune, __version__
+
+
+log = logging.getLogger(__name__)
 
 
 def main():
@@ -10,13 +13,7 @@ def main():
     )
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("--version", action="store_true")
-    parser.add_argument("--on-ambiguity", choices=["skip", "first", "all"], default='skip')
-    parser.add_argument(
-        "--symbol",
-        default="acute",
-        help=("Which stress symbol to use. Default is `acute`. "
-              "Another option is `combining`. Custom values are allowed."),
-    )
+    add_stressifier_arguments(parser)
     parser.add_argument(
         "path", nargs="*", help="File(s) to process. If not set, read from stdin"
     )
@@ -28,15 +25,59 @@ def main():
 
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
 
-    if args.symbol == "acute":
-        args.symbol = StressSymbol.AcuteAccent
-    elif args.symbol == "combining":
-        args.symbol = StressSymbol.CombiningAcuteAccent
-
-    stressify = Stressifier(stress_symbol=args.symbol, on_ambiguity=args.on_ambiguity)
+    stressify = make_stressifier(args)
     for line in fileinput.input(args.path):
         print(stressify(line), end="")
 
 
+def add_stressifier_arguments(parser):
+    """Add `Stressifier` options to a command-line parser."""
+
+    parser.add_argument("--on-ambiguity", choices=["skip", "first", "all"], default='skip')
+    parser.add_argument(
+        "--symbol",
+        default="acute",
+        help=("Which stress symbol to use. Default is `acute`. "
+              "Another option is `combining`. Custom values are allowed."),
+    )
+    parser.add_argument("--tokenize-batch-size", type=int, help="Stanza tokenizer batch size (ignored by Stanza 1.7)")
+    parser.add_argument("--pos-batch-size", type=int, help="Stanza POS tagger batch size, in sentences")
+    parser.add_argument("--threads", type=int, help="Number of torch threads for CPU inference")
+    parser.add_argument("--cpu", action="store_true", help="Do not use GPU even if available")
+    parser.add_argument("--quantize", action="store_true",
+                        help="Use int8 quantized POS tagger. Faster on CPU, slightly less accurate")
+    parser.add_argument(
+        "--autotune",
+        metavar="SAMPLE_FILE",
+        help=("Pick the fastest batch sizes and number of threads by running "
+              "on a sample text first. Overrides the options above."),
+    )
+
+
+def make_stressifier(args):
+    """Create `Stressifier` from options added by `add_stressifier_arguments`."""
+
+    symbol = args.symbol
+    if symbol == "acute":
+        symbol = StressSymbol.AcuteAccent
+    elif symbol == "combining":
+        symbol = StressSymbol.CombiningAcuteAccent
+
+    if args.autotune:
+        with open(args.autotune, encoding="utf-8") as f:
+            settings = autotune(f.read(), use_gpu=not args.cpu, quantize=args.quantize)
+        log.warning("Autotuned settings: %s", settings)
+    else:
+        settings = dict(
+            tokenize_batch_size=args.tokenize_batch_size,
+            pos_batch_size=args.pos_batch_size,
+            num_threads=args.threads,
+            use_gpu=not args.cpu,
+            quantize=args.quantize,
+        )
+
+    return Stressifier(stress_symbol=symbol, on_ambiguity=args.on_ambiguity, **settings)
+
+
 if __name__ == "__main__":
     main()
@@ -5,6 +5,8 @@ import collections
 import logging
 import tqdm
 
+from ukrainian_word_stress.dictionary import (
+    AMBIGUOUS, LATEST_VERSION, TAGSETS_KEY, VERSION_KEY, VOWELS, encode_varint)
 from ukrainian_word_stress.tags import TAGS, compress_tags
 
 
@@ -12,13 +14,21 @@ log = logging.getLogger(__name__)
 
 
 ACCENT = '\u0301'
-VOWELS = "уеіїаояиюєУЕІАОЯИЮЄЇ"
 
-def compile(csv_path: str) -> marisa_trie.BytesTrie:
+def compile(csv_path: str, version: int = LATEST_VERSION) -> marisa_trie.BytesTrie:
+    by_basic = _parse_dictionary(csv_path)
+    if version == 1:
+        return _compile_v1(by_basic)
+    elif version == 2:
+        return _compile_v2(by_basic)
+    else:
+        raise ValueError(f"Unsupported dictionary version: {version}")
+
+
+def _compile_v1(by_basic):
     POS_SEP = TAGS['POS-separator']
     REC_SEP = TAGS['Record-separator']
     trie = []
-    by_basic = _parse_dictionary(csv_path)
     for basic, forms in by_basic.items():
         accents_options = len(set(form for form, _ in forms))
         if accents_options == 1:
@@ -35,6 +45,37 @@ def compile(csv_path: str) -> marisa_trie.BytesTrie:
     return marisa_trie.BytesTrie(trie)
 
 
+def _compile_v2(by_basic):
+    # Most frequent tag combinations get the smallest ids
+    tagsets_count = collections.Counter()
+    for forms in by_basic.values():
+        if len(set(form for form, _ in forms)) > 1:
+            tagsets_count.update(compress_tags(tags) for _, tags in forms)
+    tagsets = [tags for tags, _ in tagsets_count.most_common()]
+    tagset_ids = {tags: i for i, tags in enumerate(tagsets)}
+
+    trie = []
+    for basic, forms in by_basic.items():
+        accents_options = len(set(form for form, _ in forms))
+        if accents_options == 1:
+            # no need to store tags if there's no ambiguity
+            value = accent_vowel_pos(forms[0][0])
+        else:
+            records = []
+            for form, tags in forms:
+                pos = accent_vowel_pos(form)
+                record = (encode_varint(tagset_ids[compress_tags(tags)])
+                          + bytes([len(pos)]) + pos)
+                if record not in records:
+                    records.append(record)
+            value = AMBIGUOUS + b''.join(records)
+        trie.append((basic, value))
+
+    trie.append((VERSION_KEY, bytes([2])))
+    trie.append((TAGSETS_KEY, TAGS['Record-separator'].join(tagsets)))
+    return marisa_trie.BytesTrie(trie)
+
+
 def _parse_dictionary(csv_path):
     by_basic = collections.defaultdict(list)  # TODO: change to set
     skipped = 0
@@ -154,6 +195,29 @@ def accent_pos(s: str) -> bytes:
     return b"".join(indexes)
 
 
+def accent_vowel_pos(s: str) -> bytes:
+    """Return indexes of stressed vowels among all vowels of the word.
+
+    Example::
+        >>> accent_vowel_pos("по́ми́лка")
+        b'\\x00\\x01'
+    """
+
+    indexes = []
+    vowel_index = -1
+    prev = ''
+    for c in s:
+        if c in VOWELS:
+            vowel_index += 1
+        elif c == ACCENT:
+            if prev and prev in VOWELS:
+                indexes.append(vowel_index.to_bytes(1, 'little'))
+            else:
+                log.warning("Dropping accent not placed after a vowel: %s", s)
+        prev = c
+    return b"".join(indexes)
+
+
 def count_vowels(s):
     return sum(s.count(x) for x in VOWELS)
 
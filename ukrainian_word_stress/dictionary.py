@@ -0,0 +1,197 @@
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+
+import marisa_trie
+
+from ukrainian_word_stress.tags import TAGS, decompress_tags
+
+
+log = logging.getLogger(__name__)
+
+
+VOWELS = "уеіїаояиюєУЕІАОЯИЮЄЇ"
+
+# Service keys. `StressDictionary.lookup` never returns them as words.
+VERSION_KEY = "__version__"
+TAGSETS_KEY = "__tagsets__"
+SERVICE_KEYS = frozenset([VERSION_KEY, TAGSETS_KEY])
+
+# The first byte of a version 2 value with multiple accent options
+AMBIGUOUS = b'\xFF'
+
+LATEST_VERSION = 2
+
+# `_NTH_VOWEL[k].match(word).end()` is the position right after the k-th
+# vowel of the word (0-based). Much faster than scanning the word in Python.
+_NTH_VOWEL = [re.compile(f"(?:[^{VOWELS}]*[{VOWELS}]){{{k + 1}}}") for k in range(64)]
+
+
+class StressDictionary:
+    """Compiled stress dictionary of any supported format version.
+
+    Wraps a `marisa_trie.BytesTrie` and decodes its values to a list of
+    `(tags, accents)` pairs, where `accents` are character positions
+    right after the stressed vowels.
+
+    See docs/dictionary_format.md for the format description.
+    """
+
+    __slots__ = ('trie', 'version', 'tagsets')
+
+    def __init__(self, trie: marisa_trie.BytesTrie):
+        self.trie = trie
+
+        version = trie.get(VERSION_KEY)
+        self.version = version[0][0] if version else 1
+        if self.version > LATEST_VERSION:
+            raise ValueError(f"Unsupported dictionary version: {self.version}")
+
+        # Tag combinations shared by all words, referenced by index
+        self.tagsets = []
+        if self.version >= 2:
+            table = trie[TAGSETS_KEY][0]
+            self.tagsets = [decompress_tags(tags)
+                            for tags in table.split(TAGS['Record-separator'])]
+
+    def lookup(self, word: str) -> Optional[List[Tuple[List[str], List[int]]]]:
+        """Return accent options for `word` or None if it's not in the dictionary.
+
+        The word is also looked up in lower case and title case.
+        """
+
+        if word[:1] == "_" and word.lower() in SERVICE_KEYS:
+            return None
+
+        trie = self.trie
+        values = trie.get(word)
+        if values is None:
+            values = trie.get(word.lower())
+        if values is None:
+            values = trie.get(word.title())
+        if values is None:
+            return None
+
+        assert len(values) == 1
+        if self.version == 1:
+            return _parse_value_v1(values[0])
+        return self._parse_value_v2(values[0], word)
+
+    def _parse_value_v2(self, value, word):
+        nth_vowel = _NTH_VOWEL
+        if value[:1] != AMBIGUOUS:
+            # single item, all record is vowel indexes
+            return [([], [nth_vowel[b].match(word).end() for b in value])]
+
+        accents_by_tags = []
+        i = 1
+        while i < len(value):
+            tagset_id, i = decode_varint(value, i)
+            count = value[i]
+            accents = [nth_vowel[b].match(word).end() for b in value[i + 1:i + 1 + count]]
+            i += 1 + count
+            accents_by_tags.append((self.tagsets[tagset_id], accents))
+        return accents_by_tags
+
+
+def load_dictionary(path, mmap=False) -> StressDictionary:
+    """Load compiled stress dictionary from `path`.
+
+    If `mmap` is True, try to memory-map the file first. This is much
+    faster than reading it. The file is copied to a private temporary
+    file before mapping, so that overwriting `path` later can't change
+    the dictionary under running lookups. Fall back to reading the whole
+    file if mapping is not possible.
+    """
+
+    if mmap:
+        try:
+            return StressDictionary(_mmap_private_copy(path))
+        except Exception as e:
+            log.debug("Can't mmap %s (%s), loading it to memory", path, e)
+    trie = marisa_trie.BytesTrie()
+    trie.load(str(path))
+    return StressDictionary(trie)
+
+
+def _mmap_private_copy(path):
+    fd, copy_path = tempfile.mkstemp(prefix="stress-", suffix=".trie")
+    try:
+        with os.fdopen(fd, "wb") as dst, open(path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        trie = marisa_trie.BytesTrie()
+        trie.mmap(copy_path)
+    finally:
+        # The mapping stays valid after unlink on POSIX. Elsewhere the
+        # file is in use and is left for the system to clean up.
+        try:
+            os.unlink(copy_path)
+        except OSError:
+            pass
+    return trie
+
+
+def encode_varint(n: int) -> bytes:
+    """Encode a non-negative integer in 7 bits per byte (LEB128).
+
+    Example:
+        >>> encode_varint(5)
+        b'\\x05'
+        >>> encode_varint(300)
+        b'\\xac\\x02'
+    """
+
+    result = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+
+def decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Decode integer encoded with `encode_varint` starting at `pos`.
+
+    Returns:
+        The decoded integer and the position right after it.
+    """
+
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _parse_value_v1(value):
+    POS_SEP = TAGS['POS-separator']
+    REC_SEP = TAGS['Record-separator']
+    accents_by_tags = []
+
+    if REC_SEP not in value:
+        # single item, all record is accent positions
+        accents = [int(b) for b in value]
+        tags = []
+        accents_by_tags.append((tags, accents))
+
+    else:
+        # words whose accent position depends on POS and other tags
+        items = value.split(REC_SEP)
+        for item in items:
+            if item:
+                accents, _, tags = item.partition(POS_SEP)
+                accents = [int(b) for b in accents]
+                tags = decompress_tags(tags)
+                accents_by_tags.append((tags, accents))
+
+    return accents_by_tags
@@ -0,0 +1,35 @@
+import logging
+
+import stanza
+import torch
+from torch import nn
+
+
+log = logging.getLogger(__name__)
+
+
+def quantize_pos_tagger(pipeline: stanza.Pipeline):
+    """Apply int8 dynamic quantization to the POS tagger of `pipeline`.
+
+    Linear and LSTM layers of the tagger are replaced in place with their
+    dynamically quantized versions. This speeds up CPU inference at the
+    cost of a small drop in tagging accuracy.
+
+    The model is modified in place, so modules that Stanza shares through
+    the pipeline's foundation cache (the character language models) are
+    quantized rather than copied. Quantization takes well under a second,
+    so the result is not cached on disk.
+
+    Quantization only works on CPU. If the tagger runs on GPU, it is
+    left unchanged.
+    """
+
+    model = pipeline.processors['pos'].trainer.model
+    if next(model.parameters()).device.type != 'cpu':
+        log.warning("POS tagger is not on CPU, skipping quantization")
+        return
+
+    torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear, nn.LSTM}, dtype=torch.qint8, inplace=True)
+    model.eval()
+    log.debug("Quantized POS tagger to int8")
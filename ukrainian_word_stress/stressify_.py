@@ -1,18 +1,26 @@
 from importlib import resources as pkg_resources
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import List
 
+from ukrainian_word_stress.dictionary import StressDictionary, VOWELS, load_dictionary
 from ukrainian_word_stress.mutable_text import MutableText
-from ukrainian_word_stress.tags import TAGS, decompress_tags
+from ukrainian_word_stress.quantize import quantize_pos_tagger
 
-import marisa_trie
 import stanza
+import torch
 
 
 log = logging.getLogger(__name__)
 
 
+# Dictionary words have at least one vowel. Tokens without it
+# (punctuation, numbers, Latin script) are skipped before lookup.
+_HAS_VOWEL = re.compile(f"[{VOWELS}]")
+
+
 class StressSymbol:
     AcuteAccent = "´"
     CombiningAcuteAccent = "\u0301"
@@ -43,6 +51,28 @@ class Stressifier:
                 This will look as multiple stress symbols in one word
                 (за´мо´к)
 
+        `pos_batch_size`: Number of sentences the Stanza POS tagger
+            processes at once. Larger values are usually faster, at the
+            cost of memory. Default is Stanza's own default.
+
+        `tokenize_batch_size`: Passed to Stanza as is. Note, that the
+            Stanza 1.7 tokenizer uses the batch size stored with the model
+            and ignores this setting.
+
+        `num_threads`: Number of threads torch uses for CPU inference.
+            Note, that this is a process-wide torch setting.
+            Default is torch's own choice.
+
+        `use_gpu`: Set to False to pin inference to CPU, even if
+            a GPU is available.
+
+        `quantize`: Apply int8 dynamic quantization to the POS tagger.
+            Faster on CPU, but slightly less accurate.
+            See `tests/benchmark_quantization.py` for the trade-off.
+
+        See `ukrainian_word_stress.autotune()` for picking these
+        settings automatically.
+
     Example:
         >>> stressify = Stressifier()
         >>> stressify("Привіт, як справи?")
@@ -53,33 +83,135 @@ class Stressifier:
 
     def __init__(self,
                  stress_symbol=StressSymbol.AcuteAccent,
-                 on_ambiguity=OnAmbiguity.Skip):
+                 on_ambiguity=OnAmbiguity.Skip,
+                 tokenize_batch_size=None,
+                 pos_batch_size=None,
+                 num_threads=None,
+                 use_gpu=True,
+                 quantize=False):
 
         dict_path = pkg_resources.files('ukrainian_word_stress').joinpath('data/stress.trie')
-        
-        self.dict = marisa_trie.BytesTrie()
-        self.dict.load(dict_path)
+
+        self.dict = load_dictionary(dict_path)
+        # A single worker applies reloads one by one in the order
+        # they were requested, so the latest request always wins
+        self._reload_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ukrainian-word-stress-reload")
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+
+        # Only pass settings that were set explicitly,
+        # let Stanza pick defaults for the rest
+        pipeline_options = {}
+        if tokenize_batch_size is not None:
+            pipeline_options['tokenize_batch_size'] = tokenize_batch_size
+        if pos_batch_size is not None:
+            pipeline_options['pos_batch_size'] = pos_batch_size
+
         self.nlp = stanza.Pipeline(
             'uk',
             processors='tokenize,pos,mwt',
             download_method=stanza.pipeline.core.DownloadMethod.REUSE_RESOURCES,
-            logging_level=logging.getLevelName(log.getEffectiveLevel())
+            logging_level=logging.getLevelName(log.getEffectiveLevel()),
+            use_gpu=use_gpu,
+            **pipeline_options
         )
+        if quantize:
+            quantize_pos_tagger(self.nlp)
         self.stress_symbol = stress_symbol
         self.on_ambiguity = on_ambiguity
 
-    def __call__(self, text):
+    def __call__(self, text, stats=None):
+        """Return `text` with stress marks added.
+
+        If `stats` is given (a `collections.Counter`), it is updated with
+        the number of tokens per outcome: `stressed`, `unstressed`
+        (dictionary words left without stress, e.g. unresolved ambiguity),
+        `not_in_dictionary` and `no_vowel` (punctuation, numbers, etc.)
+        """
+
+        # Take a single reference to the dictionary, so that a concurrent
+        # `reload_dictionary()` does not change it in the middle of the text
+        dictionary = self.dict
         parsed = self.nlp(text)
-        result = MutableText(text)
         log.debug("Parsed text: %s", parsed)
+        return self._stressify_parsed(dictionary, text, parsed, stats)
+
+    def _stressify_parsed(self, dictionary, text, parsed, stats=None):
+        result = MutableText(text)
+        on_ambiguity = self.on_ambiguity
         for token in parsed.iter_tokens():
-            accents = find_accent_positions(self.dict, token.to_dict()[0], self.on_ambiguity)
-            accented_token = self._apply_accent_positions(token.text, accents)
-            if accented_token != token:
+            token_text = token.text
+            if _HAS_VOWEL.search(token_text) is None:
+                if stats is not None:
+                    stats['no_vowel'] += 1
+                continue
+
+            # Read only the fields we need instead of `token.to_dict()`.
+            # Multi-word tokens have no tags of their own.
+            words = token.words
+            if len(words) == 1:
+                upos = words[0].upos
+                feats = words[0].feats
+            else:
+                upos = feats = None
+
+            accents = _find_accent_positions(dictionary, token_text, upos, feats, on_ambiguity)
+            if accents:
+                accented_token = self._apply_accent_positions(token_text, accents)
                 result.replace(token.start_char, token.end_char, accented_token)
 
+            if stats is not None:
+                if accents:
+                    stats['stressed'] += 1
+                elif dictionary.lookup(token_text) is None:
+                    stats['not_in_dictionary'] += 1
+                else:
+                    stats['unstressed'] += 1
+
         return result.get_edited_text()
 
+    def reload_dictionary(self, path, background=True):
+        """Replace the stress dictionary without reloading Stanza.
+
+        The new dictionary is memory-mapped if possible. Once loaded, it is
+        swapped in atomically: calls that are already running finish with
+        the old dictionary, new calls use the new one. Reloads are applied
+        in the order they were requested.
+
+        `path` is copied before mapping, but the copy itself is not atomic:
+        publish new dictionaries by writing to a temporary file and
+        renaming it over `path`.
+
+        Args:
+            `path`: Path to a compiled `stress.trie` file.
+            `background`: If True (default), load the dictionary in a
+                background thread and return a `concurrent.futures.Future`.
+                Its `result()` re-raises loading errors.
+                Otherwise, load it synchronously and return None.
+
+        Example:
+            >>> stressify = Stressifier()
+            >>> stressify.reload_dictionary("stress.trie").result()
+        """
+
+        if not background:
+            self._swap_dictionary(path)
+            return None
+
+        return self._reload_executor.submit(self._swap_dictionary, path)
+
+    def _swap_dictionary(self, path):
+        try:
+            dictionary = load_dictionary(path, mmap=True)
+        except Exception:
+            log.exception("Failed to reload stress dictionary from %s", path)
+            raise
+        # Attribute assignment is atomic, in-flight calls
+        # keep their own reference to the old dictionary
+        self.dict = dictionary
+        log.info("Reloaded stress dictionary from %s", path)
+
     def _apply_accent_positions(self, s, positions):
         for position in sorted(positions, reverse=True):
             s = s[:position] + self.stress_symbol + s[position:]
@@ -89,6 +221,15 @@ class Stressifier:
 def find_accent_positions(trie, parse, on_ambiguity=OnAmbiguity.Skip) -> List[int]:
     """Return best accent guess for the given token parsed tags.
 
+    `trie` is either a `marisa_trie.BytesTrie` with a compiled dictionary
+    or a `StressDictionary` wrapping it.
+
+    A bare `BytesTrie` is wrapped in a `StressDictionary` on first use, and
+    the wrapper is reused while the same trie is passed again. The module
+    keeps a reference to the last trie passed this way and its wrapper, so
+    that trie stays in memory until another one is passed. To avoid this,
+    pass a `StressDictionary` (see `load_dictionary`); it is used as is.
+
     Returns:
         A list of accent positions. The size of the list can be:
         0 for tokens that are not in the dictionary.
@@ -97,19 +238,36 @@ def find_accent_positions(trie, parse, on_ambiguity=OnAmbiguity.Skip) -> List[in
           multiple valid accents.
     """
 
-    base = parse['text']
-    for word in (base, base.lower(), base.title()):
-        if word in trie:
-            values = trie[word]
-            break
-    else:
+    return _find_accent_positions(
+        _as_stress_dictionary(trie), parse['text'], parse.get('upos'),
+        parse.get('feats'), on_ambiguity)
+
+
+# The last bare trie passed to `find_accent_positions` and its wrapper.
+# Callers usually pass the same trie many times in a row, and wrapping
+# decodes the whole tags table. Tries support neither weak references nor
+# custom attributes, so a single strong reference is the bounded option.
+_wrapped_trie = (None, None)
+
+
+def _as_stress_dictionary(trie):
+    global _wrapped_trie
+    if isinstance(trie, StressDictionary):
+        return trie
+    wrapped_for, dictionary = _wrapped_trie
+    if wrapped_for is not trie:
+        dictionary = StressDictionary(trie)
+        _wrapped_trie = (trie, dictionary)
+    return dictionary
+
+
+def _find_accent_positions(dictionary, base, upos, feats, on_ambiguity) -> List[int]:
+    accents_by_tags = dictionary.lookup(base)
+    if accents_by_tags is None:
         # non-dictionary word
         log.debug("%s is not in the dictionary", base)
         return []
 
-    assert len(values) == 1
-    accents_by_tags = _parse_dictionary_value(values[0])
-
     if len(accents_by_tags) == 0:
         # dictionary word with missing accents (dictionary has to be fixed)
         log.warning("The word `%s` is in dictionary, but lacks accents", base)
@@ -126,7 +284,7 @@ def find_accent_positions(trie, parse, on_ambiguity=OnAmbiguity.Skip) -> List[in
     # Parse tags is a superset of dictionary tags. They include more
     # irrelevant info. They also and lack `upos` which we add separately
     log.debug("Resolving ambigous entry %s", base)
-    feats = parse.get('feats', '').split('|') + [f'upos={parse.get("upos", "")}']
+    feats = (feats or '').split('|') + [f'upos={upos or ""}']
     matches = []
     for tags, accents in accents_by_tags:
         if all(tag in feats for tag in tags):
@@ -170,27 +328,3 @@ def find_accent_positions(trie, parse, on_ambiguity=OnAmbiguity.Skip) -> List[in
 
     else:
         raise ValueError(f"Unknown on_ambiguity value: {on_ambiguity}")
-
-
-def _parse_dictionary_value(value):
-    POS_SEP = TAGS['POS-separator']
-    REC_SEP = TAGS['Record-separator']
-    accents_by_tags = []
-    
-    if REC_SEP not in value:
-        # single item, all record is accent positions
-        accents = [int(b) for b in value]
-        tags = []
-        accents_by_tags.append((tags, accents))
-
-    else:
-        # words whose accent position depends on POS and other tags
-        items = value.split(REC_SEP)
-        for item in items:
-            if item:
-                accents, _, tags = item.partition(POS_SEP)
-                accents = [int(b) for b in accents]
-                tags = decompress_tags(tags)
-                accents_by_tags.append((tags, accents))
-
-    return accents_by_tags
@@ -0,0 +1,142 @@
+import itertools
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+import torch
+
+from ukrainian_word_stress.stressify_ import Stressifier
+
+
+log = logging.getLogger(__name__)
+
+
+# A few sentences to calibrate on when no sample text is given.
+# It is too small to tell large POS batch sizes apart, so those are
+# skipped with it. Pass a sample of the real workload to tune them.
+SAMPLE_TEXT = (
+    "Потяг зупинився, ми зійшли на платформу. Було тихо, широкі навскісні "
+    "промені золотили повітря, заважаючи бачити речі такими, якими вони були. "
+    "Третя по обіді. Жодної живої душі. Найкращий час для урочистих відвідин "
+    "померлих. Взяли в привокзальному торбу вина, рушили вздовж колій, "
+    "піщаною стежкою.\n"
+) * 20
+
+# Non-default batch sizes must beat Stanza defaults by this fraction,
+# otherwise the difference is considered timing noise
+NOISE = 0.05
+
+
+def autotune(sample_text: str = SAMPLE_TEXT,
+             tokenize_batch_sizes: Iterable[Optional[int]] = (None,),
+             pos_batch_sizes: Iterable[Optional[int]] = (None, 32, 128, 512),
+             num_threads: Optional[Iterable[int]] = None,
+             use_gpu: bool = True,
+             quantize: bool = False,
+             repeat: int = 2) -> Dict:
+    """Find the fastest Stanza settings for this machine.
+
+    Runs `Stressifier` on `sample_text` with every combination of
+    `tokenize_batch_sizes`, `pos_batch_sizes` and `num_threads`, and
+    returns the fastest one.
+
+    POS batch sizes that are not smaller than the number of sentences in
+    the sample are skipped: they all process the sample in a single batch,
+    so timing can't tell them apart. Use a sample with several times more
+    sentences than the largest candidate. Non-default batch sizes are only
+    picked if they are at least `NOISE` faster than Stanza defaults.
+
+    Stanza models are loaded once per pair of batch sizes; thread counts
+    are switched without reloading. This still takes a while, so run it
+    once and reuse the result.
+
+    Args:
+        `sample_text`: Text that resembles the real workload.
+        `tokenize_batch_sizes`: Candidate tokenizer batch sizes.
+            Stanza 1.7 tokenizer uses the batch size stored with the
+            model and ignores this setting, so it is not searched
+            by default.
+        `pos_batch_sizes`: Candidate POS tagger batch sizes, in sentences.
+            `None` stands for Stanza's default.
+        `num_threads`: Candidate torch thread counts. Default is
+            1, half of the CPUs and all of the CPUs.
+        `use_gpu`, `quantize`: Passed to `Stressifier` as is.
+        `repeat`: Number of timed runs per configuration. The best
+            one counts.
+
+    Returns:
+        A dictionary of keyword arguments for `Stressifier`.
+
+    Example:
+        >>> settings = autotune()
+        >>> stressify = Stressifier(**settings)
+    """
+
+    if num_threads is None:
+        cpus = os.cpu_count() or 1
+        num_threads = sorted({1, max(1, cpus // 2), cpus})
+
+    default = Stressifier(use_gpu=use_gpu, quantize=quantize)
+    sentences = len(default.nlp(sample_text).sentences)
+    candidates = []
+    for pos_batch_size in pos_batch_sizes:
+        if pos_batch_size is not None and pos_batch_size >= sentences:
+            log.info("Skipping pos_batch_size=%s: the sample has only %d sentences",
+                     pos_batch_size, sentences)
+        else:
+            candidates.append(pos_batch_size)
+
+    initial_threads = torch.get_num_threads()
+    timings = []  # (seconds, settings)
+    try:
+        for tokenize_batch_size, pos_batch_size in itertools.product(
+                tokenize_batch_sizes, candidates):
+            if tokenize_batch_size is None and pos_batch_size is None:
+                stressify = default
+            else:
+                stressify = Stressifier(tokenize_batch_size=tokenize_batch_size,
+                                        pos_batch_size=pos_batch_size,
+                                        use_gpu=use_gpu,
+                                        quantize=quantize)
+            for threads in num_threads:
+                torch.set_num_threads(threads)
+                stressify(sample_text)  # warm-up
+                elapsed = min(_time_call(stressify, sample_text)
+                              for _ in range(repeat))
+                log.debug("tokenize_batch_size=%s, pos_batch_size=%s, "
+                          "num_threads=%s: %.3f seconds",
+                          tokenize_batch_size, pos_batch_size, threads, elapsed)
+                timings.append((elapsed, {
+                    'tokenize_batch_size': tokenize_batch_size,
+                    'pos_batch_size': pos_batch_size,
+                    'num_threads': threads,
+                    'use_gpu': use_gpu,
+                    'quantize': quantize,
+                }))
+    finally:
+        torch.set_num_threads(initial_threads)
+
+    if not timings:
+        raise ValueError("No configurations to try")
+
+    best_time, best_settings = min(timings, key=lambda t: t[0])
+    defaults = [t for t in timings
+                if t[1]['tokenize_batch_size'] is None and t[1]['pos_batch_size'] is None]
+    if defaults:
+        default_time, default_settings = min(defaults, key=lambda t: t[0])
+        if best_time > default_time * (1 - NOISE):
+            if best_settings is not default_settings:
+                log.info("%s is within noise of Stanza default batch sizes, "
+                         "keeping defaults", best_settings)
+            best_time, best_settings = default_time, default_settings
+
+    log.info("Autotune picked %s (%.3f seconds on %d sentences)",
+             best_settings, best_time, sentences)
+    return best_settings
+
+
+def _time_call(stressify, text):
+    t0 = time.perf_counter()
+    stressify(text)
+    return time.perf_counter() - t0